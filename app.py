@@ -3,10 +3,18 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import numpy as np
 from datetime import datetime, timedelta
 import os
+import json
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 import base64
 from reportlab.lib.pagesizes import letter
@@ -25,6 +33,12 @@ st.set_page_config(
 CENSUS_API_KEY = None  # Census API can work without key for basic queries
 CENSUS_BASE_URL = "https://api.census.gov/data/2022/acs/acs1"
 
+logger = logging.getLogger(__name__)
+
+# County boundaries used for the county drill-down map
+COUNTIES_GEOJSON_URL = "https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json"
+COUNTIES_GEOJSON_FILE = "counties.geojson"
+
 # SDOH Metrics Configuration
 SDOH_METRICS = {
     "Median Household Income": {
@@ -59,7 +73,7 @@ SDOH_METRICS = {
     }
 }
 
-# State FIPS to abbreviation mapping
+# State FIPS to abbreviation mapping (keys are zero-padded at ingest)
 FIPS_TO_ABBREV = {
     "01": "AL", "02": "AK", "04": "AZ", "05": "AR", "06": "CA", "08": "CO", "09": "CT",
     "10": "DE", "11": "DC", "12": "FL", "13": "GA", "15": "HI", "16": "ID", "17": "IL",
@@ -68,203 +82,306 @@ FIPS_TO_ABBREV = {
     "32": "NV", "33": "NH", "34": "NJ", "35": "NM", "36": "NY", "37": "NC", "38": "ND",
     "39": "OH", "40": "OK", "41": "OR", "42": "PA", "44": "RI", "45": "SC", "46": "SD",
     "47": "TN", "48": "TX", "49": "UT", "50": "VT", "51": "VA", "53": "WA", "54": "WV",
-    "55": "WI", "56": "WY",
-    # Also include non-zero padded versions for consistency
-    "1": "AL", "2": "AK", "4": "AZ", "5": "AR", "6": "CA", "8": "CO", "9": "CT"
+    "55": "WI", "56": "WY"
 }
+# Precomputed key set for membership tests
+_FIPS_SET = frozenset(FIPS_TO_ABBREV)
+
 
+class EmptyCensusResponse(Exception):
+    """Raised when the Census API returns no data rows"""
 
 class CensusDataManager:
     def __init__(self):
         self.cache_file = "census_data_cache.csv"
         self.cache_duration = timedelta(weeks=1)  # Cache for 1 week
         # Use separate state and county cache files to avoid column conflicts
-        self.state_cache_file = "census_state_cache.csv"
-        self.county_cache_file = "census_county_cache.csv"
+        self.state_cache_file = "census_state_cache.parquet"
+        self.county_cache_file = "census_county_cache.parquet"
+        # Rows currently persisted in each cache file, kept so saves never re-read disk
+        self.cache_frames = {}
+        # Serializes cache file rewrites when counties are prefetched concurrently
+        self.cache_lock = threading.Lock()
+        # Epoch seconds each cache key was fetched, so in-memory entries expire too
+        self.cache_times = {}
+        # Disk cache is only read once on cold start; lookups hit this dict
+        self.cache_data = self.load_cache()
         
+    def is_fresh(self, cache_file):
+        """Check from the file's mtime, without reading it, whether any row can still be fresh"""
+        return (os.path.exists(cache_file)
+                and time.time() - os.path.getmtime(cache_file) < self.cache_duration.total_seconds())
+    
+    def is_expired(self, cache_key):
+        """Check whether an in-memory cache entry is older than the cache duration"""
+        fetched_at = self.cache_times.get(cache_key, 0)
+        return time.time() - fetched_at >= self.cache_duration.total_seconds()
+    
+    def drop_expired_rows(self, df):
+        """Drop cache rows whose fetched_at is older than the cache duration"""
+        return df[time.time() - df['fetched_at'] < self.cache_duration.total_seconds()]
+    
     def load_cache(self):
         """Load cached data from separate state and county files"""
         cache_data = {}
         
-        # Load state cache
-        if os.path.exists(self.state_cache_file):
+        for cache_file in (self.state_cache_file, self.county_cache_file):
+            # The mtime is the last write, so a stale file holds only expired rows
+            if not self.is_fresh(cache_file):
+                continue
             try:
-                df = pd.read_csv(self.state_cache_file, dtype={'fips': str})
-                if not df.empty:
-                    cache_time = datetime.fromisoformat(df['timestamp'].iloc[0])
-                    if datetime.now() - cache_time < self.cache_duration:
-                        for key in df['cache_key'].unique():
-                            key_data = df[df['cache_key'] == key].copy()
-                            key_data = key_data.drop(['cache_key', 'timestamp'], axis=1, errors='ignore')
-                            if 'fips' in key_data.columns:
-                                key_data['fips'] = key_data['fips'].astype(str).str.zfill(2)
-                            cache_data[key] = key_data.to_dict('records')
+                # Parquet keeps the FIPS columns as zero-padded strings
+                df = pd.read_parquet(cache_file)
+                df = self.drop_expired_rows(df)
+                self.cache_frames[cache_file] = df
+                for key, key_data in df.groupby('cache_key', sort=False):
+                    cache_data[key] = key_data.drop(columns=['cache_key', 'fetched_at']).reset_index(drop=True)
+                    self.cache_times[key] = key_data['fetched_at'].iloc[0]
             except Exception as e:
-                st.warning(f"Error loading state cache: {e}")
-        
-        # Load county cache
-        if os.path.exists(self.county_cache_file):
-            try:
-                df = pd.read_csv(self.county_cache_file, dtype={'county_fips': str, 'state_fips': str})
-                if not df.empty:
-                    cache_time = datetime.fromisoformat(df['timestamp'].iloc[0])
-                    if datetime.now() - cache_time < self.cache_duration:
-                        for key in df['cache_key'].unique():
-                            key_data = df[df['cache_key'] == key].copy()
-                            key_data = key_data.drop(['cache_key', 'timestamp'], axis=1, errors='ignore')
-                            cache_data[key] = key_data.to_dict('records')
-            except Exception as e:
-                st.warning(f"Error loading county cache: {e}")
+                st.warning(f"Error loading cache {cache_file}: {e}")
                 
         return cache_data
     
-    def save_cache(self, data):
-        """Save data to separate cache files for state and county data"""
+    def save_cache(self, cache_key, data):
+        """Add the rows for a single cache key to the state or county cache file"""
+        if data.empty:
+            return
+        
         try:
-            timestamp = datetime.now().isoformat()
-            
-            # Load existing cache
-            existing_data = self.load_cache()
-            existing_data.update(data)
-            
-            # Separate state and county data
-            state_data = {}
-            county_data = {}
-            
-            for cache_key, records in existing_data.items():
-                if cache_key.endswith('_state'):
-                    state_data[cache_key] = records
-                else:
-                    county_data[cache_key] = records
+            if cache_key.endswith('_state'):
+                cache_file = self.state_cache_file
+            else:
+                cache_file = self.county_cache_file
             
-            # Save state data
-            if state_data:
-                state_rows = []
-                for cache_key, records in state_data.items():
-                    for record in records:
-                        row = {'cache_key': cache_key, 'timestamp': timestamp}
-                        row.update(record)
-                        state_rows.append(row)
-                
-                if state_rows:
-                    df = pd.DataFrame(state_rows)
-                    df.to_csv(self.state_cache_file, index=False)
+            df = data.copy()
+            df.insert(0, 'fetched_at', self.cache_times.get(cache_key, time.time()))
+            df.insert(0, 'cache_key', cache_key)
             
-            # Save county data
-            if county_data:
-                county_rows = []
-                for cache_key, records in county_data.items():
-                    for record in records:
-                        row = {'cache_key': cache_key, 'timestamp': timestamp}
-                        row.update(record)
-                        county_rows.append(row)
-                
-                if county_rows:
-                    df = pd.DataFrame(county_rows)
-                    df.to_csv(self.county_cache_file, index=False)
+            # Parquet can't be appended to, so rewrite from the rows already in memory
+            with self.cache_lock:
+                existing = self.cache_frames.get(cache_file)
+                if existing is not None:
+                    # Replace rows for this key if a concurrent fetch already saved it,
+                    # and drop rows that expired since they were loaded
+                    existing = self.drop_expired_rows(existing[existing['cache_key'] != cache_key])
+                    df = pd.concat([existing, df], ignore_index=True)
+                df.to_parquet(cache_file, compression='zstd', index=False)
+                self.cache_frames[cache_file] = df
                     
         except Exception as e:
-            st.warning(f"Error saving cache: {e}")
+            # May run on prefetch workers, where Streamlit elements are not shown
+            logger.warning("Error saving cache for %s: %s", cache_key, e)
+    
+    def fetched_at(self, metric_key, geography_level="state"):
+        """Return when the cached data for a metric and geography was fetched, or None"""
+        fetched_at = self.cache_times.get(f"{metric_key}_{geography_level}")
+        return datetime.fromtimestamp(fetched_at) if fetched_at else None
     
     def fetch_census_data(self, metric_key, geography_level="state"):
-        """Fetch data from Census API"""
+        """Fetch data from the in-memory cache, falling back to the Census API.
+        
+        Returns a DataFrame of name, fips (or state_fips, county_fips and full_fips) and value.
+        Raises requests.exceptions.RequestException if the API call fails.
+        """
         cache_key = f"{metric_key}_{geography_level}"
-        cached_data = self.load_cache()
         
-        if cache_key in cached_data:
-            return cached_data[cache_key]
+        if cache_key in self.cache_data and not self.is_expired(cache_key):
+            return self.cache_data[cache_key]
         
         metric_config = SDOH_METRICS[metric_key]
         variable = metric_config["variable"]
         endpoint = metric_config["endpoint"]
         
-        try:
-            if geography_level == "state":
-                # Fetch state-level data
-                url = f"{CENSUS_BASE_URL}/{endpoint}"
-                params = {
-                    "get": f"{variable},NAME",
-                    "for": "state:*"
-                }
-            else:
-                # Fetch county-level data for a specific state
-                state_fips = geography_level  # Expecting state FIPS code
-                url = f"{CENSUS_BASE_URL}/{endpoint}"
-                params = {
-                    "get": f"{variable},NAME",
-                    "for": f"county:*",
-                    "in": f"state:{state_fips}"
-                }
-            
-            if CENSUS_API_KEY:
-                params["key"] = CENSUS_API_KEY
-            
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Process the data
-            if len(data) > 1:  # First row is headers
-                rows = data[1:]
-                
-                processed_data = []
-                for row in rows:
-                    try:
-                        value = float(row[0]) if row[0] not in [None, '', '-'] else None
-                        name = row[1]
-                        
-                        if geography_level == "state":
-                            fips = row[2]
-                            # Normalize FIPS code to 2-digit zero-padded format
-                            fips = fips.zfill(2)
-                            # Skip Puerto Rico and other territories for US state maps
-                            if fips not in FIPS_TO_ABBREV:
-                                continue
-                            processed_data.append({
-                                'name': name,
-                                'fips': fips,
-                                'value': value
-                            })
-                        else:
-                            state_fips = row[2].zfill(2)
-                            county_fips = row[3].zfill(3)
-                            processed_data.append({
-                                'name': name,
-                                'county_fips': county_fips,
-                                'state_fips': state_fips,
-                                'value': value
-                            })
-                    except (ValueError, IndexError):
-                        continue
-                
-                # Update cache
-                cached_data[cache_key] = processed_data
-                self.save_cache(cached_data)
-                
-                return processed_data
-            
-        except requests.exceptions.RequestException as e:
-            st.error(f"API Request failed: {e}")
-            return []
-        except Exception as e:
-            st.error(f"Error processing data: {e}")
-            return []
+        if geography_level == "state":
+            # Fetch state-level data
+            url = f"{CENSUS_BASE_URL}/{endpoint}"
+            params = {
+                "get": f"{variable},NAME",
+                "for": "state:*"
+            }
+        else:
+            # Fetch county-level data for a specific state
+            state_fips = geography_level  # Expecting state FIPS code
+            url = f"{CENSUS_BASE_URL}/{endpoint}"
+            params = {
+                "get": f"{variable},NAME",
+                "for": f"county:*",
+                "in": f"state:{state_fips}"
+            }
+        
+        if CENSUS_API_KEY:
+            params["key"] = CENSUS_API_KEY
+        
+        response = get_session().get(url, params=params, timeout=30)
+        response.raise_for_status()
+        
+        data = orjson.loads(response.content)
+        
+        # Process the data
+        headers, *rows = data  # First row is headers
+        if not rows:
+            return pd.DataFrame()
+        
+        df = pd.DataFrame(rows, columns=headers)
+        # Missing or suppressed estimates ('', '-', None) become NaN
+        df['value'] = pd.to_numeric(df[variable], errors='coerce')
+        df = df.rename(columns={'NAME': 'name'})
+        
+        if geography_level == "state":
+            # Normalize FIPS code to 2-digit zero-padded format
+            df['fips'] = df['state'].str.zfill(2)
+            # Skip Puerto Rico and other territories for US state maps
+            df = df[df['fips'].isin(_FIPS_SET)]
+            columns = ['name', 'fips', 'value']
+        else:
+            df['state_fips'] = df['state'].str.zfill(2)
+            df['county_fips'] = df['county'].str.zfill(3)
+            # 5-digit county FIPS matching the GeoJSON feature ids
+            df['full_fips'] = df['state_fips'] + df['county_fips']
+            columns = ['name', 'county_fips', 'state_fips', 'full_fips', 'value']
         
-        return []
+        processed_data = df[columns].reset_index(drop=True)
+        
+        # Update cache
+        self.cache_data[cache_key] = processed_data
+        self.cache_times[cache_key] = time.time()
+        self.save_cache(cache_key, processed_data)
+        
+        return processed_data
+
+@st.cache_resource
+def get_session():
+    """Return the process-wide HTTP session so Census API calls reuse pooled keep-alive connections"""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+    ))
+    return session
+
+@st.cache_resource
+def get_data_manager():
+    """Return the process-wide CensusDataManager, loading the disk cache once"""
+    return CensusDataManager()
+
+# The data manager owns the 1-week expiry; this memo only needs to outlive a
+# burst of reruns, so it must not stack another week on top of it
+@st.cache_data(ttl=timedelta(minutes=10), show_spinner=False)
+def _fetch_census_data(metric_key, geography_level):
+    """Memoized fetch so Streamlit reruns skip the data manager entirely"""
+    data = get_data_manager().fetch_census_data(metric_key, geography_level)
+    if data.empty:
+        # Raising keeps empty responses out of the memo so the next rerun retries
+        raise EmptyCensusResponse(f"No data returned for {metric_key} ({geography_level})")
+    return data
+
+def fetch_census_data(metric_key, geography_level="state"):
+    """Fetch data from Census API"""
+    # Errors are handled outside the memoized function so failures are not cached
+    try:
+        return _fetch_census_data(metric_key, geography_level)
+    except EmptyCensusResponse:
+        return pd.DataFrame()
+    except requests.exceptions.RequestException as e:
+        st.error(f"API Request failed: {e}")
+        return pd.DataFrame()
+    except Exception as e:
+        st.error(f"Error processing data: {e}")
+        return pd.DataFrame()
+
+@st.cache_resource
+def get_prefetch_executor():
+    """Return the process-wide thread pool that runs county prefetches in the background"""
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="county-prefetch")
+
+def _prefetch_county_data(data_manager, metric_key, state_fips):
+    """Fetch one state's county data on a prefetch worker, logging failures"""
+    try:
+        data_manager.fetch_census_data(metric_key, state_fips)
+    except Exception as e:
+        # Failed states are simply fetched again on demand when selected
+        logger.warning("County prefetch failed for %s in state %s: %s", metric_key, state_fips, e)
+
+@st.cache_data(ttl=timedelta(weeks=1), show_spinner=False)
+def prefetch_all_counties(metric_key):
+    """Queue county data fetches for every state in the background to warm the cache"""
+    data_manager = get_data_manager()
+    state_fips_codes = data_manager.fetch_census_data(metric_key, "state")['fips'].tolist()
+    
+    # Worker threads go straight to the data manager; the rerun does not wait for them
+    executor = get_prefetch_executor()
+    for fips in state_fips_codes:
+        executor.submit(_prefetch_county_data, data_manager, metric_key, fips)
+    
+    return state_fips_codes
+
+@st.cache_data(ttl=timedelta(minutes=10), show_spinner=False)
+def state_name_options(metric_key):
+    """Sorted names of states with data for the metric, for the drill-down dropdown"""
+    state_data = _fetch_census_data(metric_key, "state")
+    return sorted(state_data.loc[state_data['value'].notna(), 'name'])
+
+@st.cache_data(ttl=timedelta(minutes=5), show_spinner=False)
+def _download_counties_geojson():
+    """Download the county boundaries GeoJSON, returning None if it is unreachable.
+    
+    Failures are memoized for the TTL so county renders don't retry a dead host
+    on every rerun; the short timeout and lack of retries bound the first attempt.
+    """
+    try:
+        response = requests.get(COUNTIES_GEOJSON_URL, timeout=10)
+        response.raise_for_status()
+        return response.content
+    except requests.exceptions.RequestException as e:
+        logger.warning("Could not download county boundaries: %s", e)
+        return None
+
+@st.cache_resource
+def load_counties_geojson():
+    """Load the county boundaries GeoJSON, downloading it to disk on first use"""
+    if os.path.exists(COUNTIES_GEOJSON_FILE):
+        try:
+            with open(COUNTIES_GEOJSON_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            # Corrupt or truncated file: discard it and download a fresh copy
+            logger.warning("Discarding unreadable %s: %s", COUNTIES_GEOJSON_FILE, e)
+            os.remove(COUNTIES_GEOJSON_FILE)
+    
+    content = _download_counties_geojson()
+    if content is None:
+        raise RuntimeError("County boundaries are currently unavailable")
+    geojson = json.loads(content)
+    
+    # Write to a temp file and swap it in so an interrupted write never leaves a partial file
+    tmp_file = f"{COUNTIES_GEOJSON_FILE}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_file, COUNTIES_GEOJSON_FILE)
+    
+    return geojson
+
+@st.cache_resource
+def load_county_features_by_state():
+    """Index county GeoJSON features by the 2-digit state FIPS prefix of their id"""
+    features_by_state = defaultdict(list)
+    for feature in load_counties_geojson()['features']:
+        features_by_state[feature['id'][:2]].append(feature)
+    return dict(features_by_state)
 
+@st.cache_data(max_entries=20, show_spinner=False)
 def create_choropleth_map(data, metric_key, title_suffix=""):
-    """Create a choropleth map using Plotly"""
-    if not data:
+    """Create a choropleth map using Plotly, memoized on the data and metric"""
+    if data.empty or 'value' not in data.columns:
         return None
     
-    df = pd.DataFrame(data)
-    if df.empty or 'value' not in df.columns:
-        return None
+    # Remove rows with null values
+    df = data.dropna(subset=['value'])
     
-    # Remove rows with null values and filter out territories
-    df = df.dropna(subset=['value'])
-    df = df[df['fips'].isin(FIPS_TO_ABBREV.keys())]
+    # Convert FIPS to state abbreviations; territories fail the mapping and drop out
+    df['abbrev'] = df['fips'].map(FIPS_TO_ABBREV)
+    df = df[df['abbrev'].notna()]
     
     if df.empty:
         return None
@@ -275,11 +392,6 @@ def create_choropleth_map(data, metric_key, title_suffix=""):
     # Choose color scale based on metric type
     color_scale = 'Greens' if is_positive else 'Reds'
     
-    # Convert FIPS to state abbreviations
-    df['abbrev'] = df['fips'].map(FIPS_TO_ABBREV)
-    # Remove any rows where mapping failed
-    df = df.dropna(subset=['abbrev'])
-    
     # Create the choropleth map
     fig = go.Figure(data=go.Choropleth(
         locations=df['abbrev'],
@@ -310,23 +422,15 @@ def create_choropleth_map(data, metric_key, title_suffix=""):
 
 def create_county_map(data, metric_key, state_name):
     """Create a county-level choropleth map"""
-    if not data:
-        return None
-    
-    df = pd.DataFrame(data)
-    if df.empty or 'value' not in df.columns:
+    if data.empty or 'value' not in data.columns:
         return None
     
     # Remove rows with null values
-    df = df.dropna(subset=['value'])
+    df = data.dropna(subset=['value'])
     
     if df.empty:
         return None
     
-    # Create FIPS codes for counties (state + county)
-    df['full_fips'] = df['state_fips'] + df['county_fips']
-
-    
     metric_config = SDOH_METRICS[metric_key]
     is_positive = metric_config["positive"]
     
@@ -338,9 +442,16 @@ def create_county_map(data, metric_key, state_name):
 
     # Create choropleth map using geojson
     try:
+        # Only send the selected state's county polygons to the browser
+        state_fips = df['state_fips'].iloc[0]
+        state_geojson = {
+            'type': 'FeatureCollection',
+            'features': load_county_features_by_state().get(state_fips, [])
+        }
+        
         fig = px.choropleth(
             df,
-            geojson="https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json",
+            geojson=state_geojson,
             locations='full_fips',
             color='value',
             color_continuous_scale=color_scale,
@@ -392,19 +503,14 @@ def create_county_map(data, metric_key, state_name):
 
 def export_data_to_csv(data, filename=None):
     """Export data to CSV format"""
-    if not data:
+    if data.empty:
         return None
     
-    df = pd.DataFrame(data)
-    csv_buffer = BytesIO()
-    df.to_csv(csv_buffer, index=False)
-    csv_buffer.seek(0)
-    
-    return csv_buffer.getvalue()
+    return data.to_csv(index=False).encode('utf-8')
 
-def export_data_to_pdf(data, metric_key, title):
+def export_data_to_pdf(data, metric_key, title, retrieved_at=None):
     """Export data to PDF format"""
-    if not data:
+    if data.empty:
         return None
     
     buffer = BytesIO()
@@ -423,22 +529,22 @@ def export_data_to_pdf(data, metric_key, title):
     story.append(desc_para)
     story.append(Spacer(1, 12))
     
-    # Data timestamp
-    timestamp_para = Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal'])
-    story.append(timestamp_para)
-    story.append(Spacer(1, 12))
+    # Data timestamp; reports are memoized, so stamp when the data was retrieved
+    if retrieved_at:
+        timestamp_para = Paragraph(f"<b>Data retrieved:</b> {retrieved_at.strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal'])
+        story.append(timestamp_para)
+        story.append(Spacer(1, 12))
     
     # Data summary
-    df = pd.DataFrame(data)
-    if not df.empty and 'value' in df.columns:
-        clean_df = df.dropna(subset=['value'])
-        if not clean_df.empty:
+    if 'value' in data.columns:
+        stats = data['value'].agg(['count', 'mean', 'min', 'max'])
+        if stats['count']:
             stats_para = Paragraph(
                 f"<b>Data Summary:</b><br/>"
-                f"Total locations: {len(clean_df)}<br/>"
-                f"Average: {clean_df['value'].mean():.2f}<br/>"
-                f"Minimum: {clean_df['value'].min():.2f}<br/>"
-                f"Maximum: {clean_df['value'].max():.2f}",
+                f"Total locations: {int(stats['count'])}<br/>"
+                f"Average: {stats['mean']:.2f}<br/>"
+                f"Minimum: {stats['min']:.2f}<br/>"
+                f"Maximum: {stats['max']:.2f}",
                 styles['Normal']
             )
             story.append(stats_para)
@@ -447,13 +553,25 @@ def export_data_to_pdf(data, metric_key, title):
     buffer.seek(0)
     return buffer.getvalue()
 
+@st.cache_data(max_entries=20, show_spinner=False)
+def build_state_csv(state_data):
+    """Memoized CSV export of the state data so repeat clicks skip serialization"""
+    return export_data_to_csv(state_data)
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def build_state_pdf(state_data, metric_key, retrieved_at):
+    """Memoized PDF report of the state data so repeat clicks skip reportlab"""
+    return export_data_to_pdf(
+        state_data,
+        metric_key,
+        f"SDOH Report: {metric_key} by State",
+        retrieved_at
+    )
+
 def main():
     st.title("🏥 Social Determinants of Health (SDOH) Dashboard")
     st.markdown("### Exploring Health Equity Across the United States")
     
-    # Initialize data manager
-    data_manager = CensusDataManager()
-    
     # Sidebar for controls
     st.sidebar.header("📊 Dashboard Controls")
     
@@ -495,9 +613,9 @@ def main():
     with col1:
         # Load and display national map
         with st.spinner(f"Loading {selected_metric} data..."):
-            state_data = data_manager.fetch_census_data(selected_metric, "state")
+            state_data = fetch_census_data(selected_metric, "state")
         
-        if state_data:
+        if not state_data.empty:
             # st.write(pd.DataFrame(state_data).head())
             # st.write(state_data)
 
@@ -511,6 +629,9 @@ def main():
                     on_select="rerun"
                 )
                 
+                # Warm the county cache for all states in the background
+                prefetch_all_counties(selected_metric)
+                
                 # Handle state selection
                 st.markdown("### 🔍 State Drill-Down")
                 
@@ -518,6 +639,10 @@ def main():
                 if "selected_state_name" not in st.session_state:
                     st.session_state.selected_state_name = ""
                 
+                # Index states once per rerun for click and dropdown lookups
+                state_name_by_abbrev = dict(zip(state_data['fips'].map(FIPS_TO_ABBREV), state_data['name']))
+                state_fips_by_name = dict(zip(state_data['name'], state_data['fips']))
+                
                 # Check for map clicks
                 selected_state = ""
                 if clicked_data and "selection" in clicked_data:
@@ -527,15 +652,13 @@ def main():
                         point = points[0]
                         if "location" in point:
                             # Convert abbreviation back to full name
-                            abbrev = point["location"]
-                            for item in state_data:
-                                if item['fips'] in FIPS_TO_ABBREV and FIPS_TO_ABBREV[item['fips']] == abbrev:
-                                    selected_state = item['name']
-                                    st.session_state.selected_state_name = selected_state
-                                    break
+                            clicked_state = state_name_by_abbrev.get(point["location"])
+                            if clicked_state:
+                                selected_state = clicked_state
+                                st.session_state.selected_state_name = selected_state
                 
                 # Create selectbox with current selection
-                state_names = sorted([item['name'] for item in state_data if item['value'] is not None])
+                state_names = state_name_options(selected_metric)
                 selected_state = st.selectbox(
                     "Select a state to view county-level data (or click on the map above):",
                     [""] + state_names,
@@ -550,36 +673,32 @@ def main():
                 # Show county data if a state is selected
                 if st.session_state.selected_state_name:
                     # Find state FIPS code
-                    state_fips = None
-                    for item in state_data:
-                        if item['name'] == st.session_state.selected_state_name:
-                            state_fips = item['fips']
-                            break
+                    state_fips = state_fips_by_name.get(st.session_state.selected_state_name)
                     
                     if state_fips:
                         st.markdown(f"#### 📍 {st.session_state.selected_state_name} Counties")
                         
                         with st.spinner(f"Loading county data for {st.session_state.selected_state_name}..."):
-                            county_data = data_manager.fetch_census_data(selected_metric, state_fips)
+                            county_data = fetch_census_data(selected_metric, state_fips)
                         
-                        if county_data:
+                        if not county_data.empty:
                             county_fig = create_county_map(county_data, selected_metric, st.session_state.selected_state_name)
                             if county_fig:
                                 st.plotly_chart(county_fig, use_container_width=True)
                                 
                                 # County data summary
-                                df = pd.DataFrame(county_data)
-                                clean_df = df.dropna(subset=['value'])
-                                if not clean_df.empty:
+                                # count/mean/min/max skip missing values, so no dropna is needed
+                                stats = county_data['value'].agg(['count', 'mean', 'min', 'max'])
+                                if stats['count']:
                                     col1, col2, col3, col4 = st.columns(4)
                                     with col1:
-                                        st.metric("Counties", len(clean_df))
+                                        st.metric("Counties", int(stats['count']))
                                     with col2:
-                                        st.metric("Average", f"{clean_df['value'].mean():.2f}")
+                                        st.metric("Average", f"{stats['mean']:.2f}")
                                     with col3:
-                                        st.metric("Minimum", f"{clean_df['value'].min():.2f}")
+                                        st.metric("Minimum", f"{stats['min']:.2f}")
                                     with col4:
-                                        st.metric("Maximum", f"{clean_df['value'].max():.2f}")
+                                        st.metric("Maximum", f"{stats['max']:.2f}")
                         else:
                             st.warning(f"No county data available for {st.session_state.selected_state_name}")
                 else:
@@ -597,8 +716,8 @@ def main():
     
     with export_col1:
         if st.button("📊 Export State Data (CSV)"):
-            if state_data:
-                csv_data = export_data_to_csv(state_data, f"sdoh_{selected_metric}_states.csv")
+            if not state_data.empty:
+                csv_data = build_state_csv(state_data)
                 if csv_data:
                     st.download_button(
                         label="Download CSV",
@@ -609,11 +728,11 @@ def main():
     
     with export_col2:
         if st.button("📄 Export State Data (PDF)"):
-            if state_data:
-                pdf_data = export_data_to_pdf(
-                    state_data, 
-                    selected_metric, 
-                    f"SDOH Report: {selected_metric} by State"
+            if not state_data.empty:
+                pdf_data = build_state_pdf(
+                    state_data,
+                    selected_metric,
+                    get_data_manager().fetched_at(selected_metric, "state")
                 )
                 if pdf_data:
                     st.download_button(
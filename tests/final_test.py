@@ -1,34 +1,26 @@
 #!/usr/bin/env python3
 """Final test of the complete data pipeline"""
 
-import pandas as pd
-import requests
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app
 
 def test_complete_pipeline():
     """Test the complete data processing pipeline"""
     print("🧪 Testing complete data pipeline...")
     
-    # Test the Census API call
-    url = 'https://api.census.gov/data/2022/acs/acs1/profile'
-    params = {'get': 'DP03_0062E,NAME', 'for': 'state:*'}
+    # Run the app's own fetch and parsing against the live Census API,
+    # keeping its cache files out of the project directory
+    old_cwd = os.getcwd()
+    cache_dir = tempfile.mkdtemp()
     
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Process the data like the app does
-        processed_data = []
-        for row in data[1:]:  # Skip headers
-            try:
-                value = float(row[0]) if row[0] not in [None, '', '-'] else None
-                name = row[1]
-                fips = row[2]
-                processed_data.append({'name': name, 'fips': fips, 'value': value})
-            except:
-                continue
-        
-        df = pd.DataFrame(processed_data)
+        os.chdir(cache_dir)
+        df = app.CensusDataManager().fetch_census_data('Median Household Income', 'state')
         clean_df = df.dropna(subset=['value'])
         
         print(f'✅ Successfully processed data for {len(clean_df)} states')
@@ -42,10 +34,13 @@ def test_complete_pipeline():
     except Exception as e:
         print(f'❌ Pipeline test failed: {e}')
         return False
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(cache_dir)
 
 if __name__ == "__main__":
     success = test_complete_pipeline()
     if success:
         print("\n🎉 All systems operational! Application ready for use.")
     else:
-        print("\n⚠️ Pipeline issues detected.")
\ No newline at end of file
+        print("\n⚠️ Pipeline issues detected.")
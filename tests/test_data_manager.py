@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Offline tests for CensusDataManager parsing and the Parquet cache
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app
+
+METRIC = "Poverty Rate"
+VARIABLE = app.SDOH_METRICS[METRIC]["variable"]
+
+STATE_PAYLOAD = [
+    [VARIABLE, "NAME", "state"],
+    ["12.5", "Alabama", "01"],
+    ["-", "Alaska", "02"],
+    ["", "California", "6"],
+    ["9.1", "Puerto Rico", "72"],
+]
+
+COUNTY_PAYLOAD = [
+    [VARIABLE, "NAME", "state", "county"],
+    ["10.0", "Autauga County, Alabama", "1", "1"],
+    [None, "Baldwin County, Alabama", "01", "003"],
+]
+
+
+def fake_census_get(url, params=None, **kwargs):
+    """Stand-in for the shared session's get returning canned Census payloads"""
+    payload = STATE_PAYLOAD if params["for"] == "state:*" else COUNTY_PAYLOAD
+    return mock.Mock(content=json.dumps(payload).encode())
+
+
+class CacheDir:
+    """Run a block inside a throwaway working directory for the cache files"""
+
+    def __enter__(self):
+        self.old_cwd = os.getcwd()
+        self.path = tempfile.mkdtemp()
+        os.chdir(self.path)
+        return self.path
+
+    def __exit__(self, *exc):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.path)
+
+
+def test_state_parsing():
+    """Values are coerced to NaN, FIPS codes padded and territories dropped"""
+    with CacheDir(), mock.patch.object(app.get_session(), "get", side_effect=fake_census_get):
+        df = app.CensusDataManager().fetch_census_data(METRIC, "state")
+
+    assert list(df.columns) == ["name", "fips", "value"]
+    assert df["fips"].tolist() == ["01", "02", "06"]
+    assert df["value"].iloc[0] == 12.5
+    assert df["value"].iloc[1:].isna().all()
+
+
+def test_county_parsing():
+    """County rows get padded state, county and full FIPS codes"""
+    with CacheDir(), mock.patch.object(app.get_session(), "get", side_effect=fake_census_get):
+        df = app.CensusDataManager().fetch_census_data(METRIC, "01")
+
+    assert df["state_fips"].tolist() == ["01", "01"]
+    assert df["county_fips"].tolist() == ["001", "003"]
+    assert df["full_fips"].tolist() == ["01001", "01003"]
+    assert df["value"].iloc[0] == 10.0
+    assert pd.isna(df["value"].iloc[1])
+
+
+def test_cache_round_trip():
+    """A new manager loads saved state and county data without calling the API"""
+    with CacheDir():
+        with mock.patch.object(app.get_session(), "get", side_effect=fake_census_get):
+            manager = app.CensusDataManager()
+            state_df = manager.fetch_census_data(METRIC, "state")
+            county_df = manager.fetch_census_data(METRIC, "01")
+
+        with mock.patch.object(app.get_session(), "get") as census_get:
+            reloaded = app.CensusDataManager()
+            pd.testing.assert_frame_equal(reloaded.fetch_census_data(METRIC, "state"), state_df)
+            pd.testing.assert_frame_equal(reloaded.fetch_census_data(METRIC, "01"), county_df)
+            census_get.assert_not_called()
+
+
+def test_save_replaces_existing_key():
+    """Saving a key twice, as concurrent fetches can, keeps a single copy of its rows"""
+    with CacheDir():
+        with mock.patch.object(app.get_session(), "get", side_effect=fake_census_get):
+            manager = app.CensusDataManager()
+            county_df = manager.fetch_census_data(METRIC, "01")
+        manager.save_cache(f"{METRIC}_01", county_df)
+
+        reloaded = app.CensusDataManager()
+        pd.testing.assert_frame_equal(reloaded.cache_data[f"{METRIC}_01"], county_df)
+
+
+def test_expired_rows_are_refetched():
+    """Rows older than the cache duration are not served after a restart"""
+    with CacheDir():
+        with mock.patch.object(app.get_session(), "get", side_effect=fake_census_get):
+            app.CensusDataManager().fetch_census_data(METRIC, "01")
+
+        eight_days_later = time.time() + 8 * 24 * 3600
+        with mock.patch("time.time", return_value=eight_days_later):
+            with mock.patch.object(app.get_session(), "get", side_effect=fake_census_get) as census_get:
+                reloaded = app.CensusDataManager()
+                assert reloaded.cache_data == {}
+                reloaded.fetch_census_data(METRIC, "01")
+                census_get.assert_called_once()
+
+
+def test_save_after_files_age_keeps_new_data():
+    """New data saved to an aged cache file is still loaded on the next start"""
+    with CacheDir():
+        with mock.patch.object(app.get_session(), "get", side_effect=fake_census_get):
+            manager = app.CensusDataManager()
+            manager.fetch_census_data(METRIC, "01")
+            aged = time.time() - 8 * 24 * 3600
+            os.utime(manager.county_cache_file, (aged, aged))
+            manager.fetch_census_data(METRIC, "06")
+
+        assert manager.is_fresh(manager.county_cache_file)
+        assert f"{METRIC}_06" in app.CensusDataManager().cache_data
+
+
+def test_empty_response_is_not_memoized():
+    """A header-only response is retried on the next call instead of being cached"""
+    empty = mock.Mock(content=json.dumps([STATE_PAYLOAD[0]]).encode())
+    with CacheDir():
+        app.get_data_manager.clear()
+        app._fetch_census_data.clear()
+        with mock.patch.object(app.get_session(), "get", return_value=empty) as census_get:
+            assert app.fetch_census_data(METRIC, "state").empty
+            assert app.fetch_census_data(METRIC, "state").empty
+            assert census_get.call_count == 2
+        app.get_data_manager.clear()
+        app._fetch_census_data.clear()
+
+
+def test_corrupt_geojson_is_redownloaded():
+    """A truncated counties GeoJSON file is replaced with a fresh download"""
+    geojson = {"type": "FeatureCollection", "features": [{"type": "Feature", "id": "01001"}]}
+    with CacheDir():
+        with open(app.COUNTIES_GEOJSON_FILE, "w") as f:
+            f.write('{"type": "FeatureCol')
+
+        app.load_counties_geojson.clear()
+        app._download_counties_geojson.clear()
+        with mock.patch.object(app.requests, "get", return_value=mock.Mock(content=json.dumps(geojson).encode())):
+            assert app.load_counties_geojson() == geojson
+        app.load_counties_geojson.clear()
+        app._download_counties_geojson.clear()
+
+        with open(app.COUNTIES_GEOJSON_FILE) as f:
+            assert json.load(f) == geojson
+
+
+def test_geojson_download_failure_is_not_retried_every_render():
+    """An unreachable GeoJSON host is tried once per cooldown, not on every render"""
+    with CacheDir():
+        app.load_counties_geojson.clear()
+        app._download_counties_geojson.clear()
+        failure = app.requests.exceptions.ConnectionError("unreachable")
+        with mock.patch.object(app.requests, "get", side_effect=failure) as geojson_get:
+            for _ in range(2):
+                try:
+                    app.load_counties_geojson()
+                    assert False, "expected the missing boundaries to raise"
+                except RuntimeError:
+                    pass
+            geojson_get.assert_called_once()
+        app._download_counties_geojson.clear()
+
+
+if __name__ == "__main__":
+    for test in (test_state_parsing, test_county_parsing, test_cache_round_trip,
+                 test_save_replaces_existing_key, test_expired_rows_are_refetched,
+                 test_save_after_files_age_keeps_new_data, test_empty_response_is_not_memoized,
+                 test_corrupt_geojson_is_redownloaded,
+                 test_geojson_download_failure_is_not_retried_every_render):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎉 Data manager parsing and caching work correctly!")